@@ -4,9 +4,11 @@ EMO v0.1 - Emergent Mind Observatory core package.
 This package provides metric computations for:
 - Organismality Index (OI)
 - Synergy / O-information-like indicator
-- Global Workspace Ignition (GWI)
+- Global Workspace Ignition (GWI), news/search lead-lag and streaming detection
 - Self-Model Fidelity (SMF)
 - Information-time (τ_I)
+- As-of backtests of the yearly metrics across cutoff years
+- Sharded per-country / per-topic runs through a work queue
 """
 
 __all__ = [
@@ -16,8 +18,14 @@ __all__ = [
     "organismality",
     "synergy",
     "gwi",
+    "gwi_lag",
+    "gwi_stream",
+    "pyramid",
+    "render",
     "smf",
     "info_time",
+    "asof",
+    "sharding",
 ]
 
 __version__ = "0.1.0"
@@ -0,0 +1,245 @@
+"""
+As-of backtesting of the yearly vital signs for EMO v0.1.
+
+For every cutoff year c we want the value each metric would have reported
+if it had been run on the data available up to c (all rows with
+year <= c). Re-running the metrics per cutoff re-z-scores every prefix,
+which is O(n^2). Instead we sweep the sorted years once:
+
+- OI: expanding means / sample variances of the log series (cumulative
+  sums) give each prefix's z-scores; the 20-year trend only needs the
+  rows inside the window, so it costs O(n * 20).
+- SMF: SMF(t) does not depend on the prefix, so the global SMF is a
+  cumulative mean and the target/actual correlation comes from cumulative
+  sums of x, y, x^2, y^2 and xy.
+- τ_I: the cumulative positive skill gain is already a prefix statistic.
+
+The result is a cutoff x metric table whose values match
+`compute_organismality`, `compute_smf` and `compute_info_time` run on
+each prefix (NaN where those would return None).
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .utils import logistic
+
+
+def _prefix_lengths(years: np.ndarray, cutoffs: np.ndarray) -> np.ndarray:
+    """
+    Number of rows with year <= cutoff, for sorted `years`.
+    """
+    return np.searchsorted(years, cutoffs, side="right")
+
+
+def _expanding_mean_std(x: np.ndarray):
+    """
+    Mean and sample std (ddof=1) of every prefix x[:k], k = 1..n.
+
+    Values are shifted by their overall mean first to limit cancellation.
+    A (numerically) zero variance gives std 0, as in utils.zscore.
+    """
+    shift = x.mean() if len(x) else 0.0
+    d = x - shift
+    k = np.arange(1, len(x) + 1, dtype=float)
+    s1 = np.cumsum(d)
+    s2 = np.cumsum(d * d)
+    mean = s1 / k
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (s2 - k * mean * mean) / (k - 1)
+    var = np.where(var <= 1e-12 * np.maximum(s2 / k, 1e-300), 0.0, var)
+    std = np.sqrt(np.where(np.isfinite(var), var, 0.0))
+    return mean + shift, std
+
+
+def _z(values: np.ndarray, mean: float, std: float) -> np.ndarray:
+    if std == 0:
+        return np.zeros_like(values)
+    return (values - mean) / std
+
+
+def _slope(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    Least-squares slope, as returned by utils.simple_linear_trend.
+    """
+    if len(x) < 2:
+        return 0.0
+    xc = x - x.mean()
+    denom = float(np.dot(xc, xc))
+    if denom == 0:
+        return 0.0
+    return float(np.dot(xc, y - y.mean()) / denom)
+
+
+def _asof_organismality(
+    treaties_df: pd.DataFrame,
+    conflict_df: pd.DataFrame,
+    cutoffs: np.ndarray,
+    year_col: str,
+    treaties_col: str,
+    conflict_col: str,
+) -> Dict[str, np.ndarray]:
+    t = treaties_df[[year_col, treaties_col]]
+    c = conflict_df[[year_col, conflict_col]]
+    df = pd.merge(t, c, on=year_col, how="inner").dropna()
+    df = df.sort_values(year_col, kind="stable")
+
+    years = df[year_col].to_numpy(dtype=float)
+    coop = np.log1p(df[treaties_col].to_numpy(dtype=float))
+    viol = np.log1p(df[conflict_col].to_numpy(dtype=float))
+    coop_mean, coop_std = _expanding_mean_std(coop)
+    viol_mean, viol_std = _expanding_mean_std(viol)
+
+    latest = np.full(len(cutoffs), np.nan)
+    trend = np.full(len(cutoffs), np.nan)
+    for i, m in enumerate(_prefix_lengths(years, cutoffs)):
+        if m == 0:
+            continue
+        last = m - 1
+        lo = int(np.searchsorted(years[:m], years[last] - 19, side="left"))
+        oi = logistic(
+            _z(coop[lo:m], coop_mean[last], coop_std[last])
+            - _z(viol[lo:m], viol_mean[last], viol_std[last])
+        )
+        latest[i] = oi[-1]
+        if m >= 2:
+            trend[i] = _slope(years[lo:m], oi)
+
+    return {"oi_latest_value": latest, "oi_trend_20y_slope": trend}
+
+
+def _asof_smf(
+    target_df: pd.DataFrame,
+    actual_df: pd.DataFrame,
+    cutoffs: np.ndarray,
+    year_col: str,
+    target_col: str,
+    actual_col: str,
+    k: float,
+) -> Dict[str, np.ndarray]:
+    t = target_df[[year_col, target_col]]
+    a = actual_df[[year_col, actual_col]]
+    df = pd.merge(t, a, on=year_col, how="inner").dropna()
+    df = df.sort_values(year_col, kind="stable")
+
+    years = df[year_col].to_numpy(dtype=float)
+    x = df[target_col].to_numpy(dtype=float)
+    y = df[actual_col].to_numpy(dtype=float)
+
+    denom = np.maximum(np.maximum(np.abs(x), np.abs(y)), 1e-9)
+    smf = logistic(-np.abs((y - x) / denom) * k)
+
+    n = np.arange(1, len(x) + 1, dtype=float)
+    global_smf = np.cumsum(smf) / n
+
+    # Pearson correlation of every prefix from cumulative sums (shifted)
+    xd = x - (x.mean() if len(x) else 0.0)
+    yd = y - (y.mean() if len(y) else 0.0)
+    sx, sy = np.cumsum(xd), np.cumsum(yd)
+    sxx, syy, sxy = np.cumsum(xd * xd), np.cumsum(yd * yd), np.cumsum(xd * yd)
+    cov = sxy - sx * sy / n
+    vx = sxx - sx * sx / n
+    vy = syy - sy * sy / n
+    vx = np.where(vx <= 1e-12 * np.maximum(sxx, 1e-300), 0.0, vx)
+    vy = np.where(vy <= 1e-12 * np.maximum(syy, 1e-300), 0.0, vy)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.where((vx > 0) & (vy > 0), cov / np.sqrt(vx * vy), np.nan)
+    corr = np.clip(corr, -1.0, 1.0)
+
+    m = _prefix_lengths(years, cutoffs)
+    has = m > 0
+    idx = np.maximum(m - 1, 0)
+    return {
+        "smf_global": np.where(has, global_smf[idx] if len(x) else np.nan, np.nan),
+        "smf_correlation": np.where(m >= 2, corr[idx] if len(x) else np.nan, np.nan),
+    }
+
+
+def _asof_info_time(
+    skill_df: pd.DataFrame,
+    cutoffs: np.ndarray,
+    year_col: str,
+    skill_col: str,
+) -> Dict[str, np.ndarray]:
+    df = skill_df[[year_col, skill_col]].dropna()
+    df = df.sort_values(year_col, kind="stable")
+
+    years = df[year_col].to_numpy(dtype=int)
+    skill = df[skill_col].to_numpy(dtype=float)
+    gain = np.clip(np.diff(skill, prepend=skill[:1]), 0.0, None)
+    tau = np.cumsum(gain)
+
+    m = _prefix_lengths(years, cutoffs)
+    ok = m >= 2
+    idx = np.maximum(m - 1, 0)
+
+    out_tau = np.full(len(cutoffs), np.nan)
+    out_cal = np.full(len(cutoffs), np.nan)
+    if len(years):
+        out_tau = np.where(ok, tau[idx] - tau[0], np.nan)
+        span = (years[idx] - years[0]).astype(float)
+        out_cal = np.where(ok & (span > 0), span, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        accel = out_tau / out_cal
+
+    return {
+        "info_tau_span": out_tau,
+        "info_calendar_span": out_cal,
+        "info_accel_ratio": accel,
+    }
+
+
+def compute_asof(
+    treaties_df: Optional[pd.DataFrame] = None,
+    conflict_df: Optional[pd.DataFrame] = None,
+    target_df: Optional[pd.DataFrame] = None,
+    actual_df: Optional[pd.DataFrame] = None,
+    skill_df: Optional[pd.DataFrame] = None,
+    cutoffs: Optional[Sequence[int]] = None,
+    year_col: str = "year",
+    treaties_col: str = "treaty_parties",
+    conflict_col: str = "conflict_deaths",
+    target_col: str = "co2_target",
+    actual_col: str = "co2_actual",
+    skill_col: str = "skill",
+    k: float = 5.0,
+) -> pd.DataFrame:
+    """
+    Value of each yearly metric as of every cutoff year.
+
+    Metrics whose inputs are None are left out of the table.
+
+    Parameters
+    ----------
+    cutoffs : sequence of int, optional
+        Cutoff years; defaults to every year present in the given inputs.
+
+    Returns
+    -------
+    pd.DataFrame indexed by cutoff with columns (as available):
+    [oi_latest_value, oi_trend_20y_slope, smf_global, smf_correlation,
+    info_tau_span, info_calendar_span, info_accel_ratio].
+    """
+    inputs = [treaties_df, conflict_df, target_df, actual_df, skill_df]
+    if cutoffs is None:
+        years = [df[year_col].dropna().to_numpy() for df in inputs if df is not None]
+        cutoffs = np.unique(np.concatenate(years)) if years else np.array([])
+    cutoffs = np.asarray(cutoffs, dtype=float)
+
+    table: Dict[str, np.ndarray] = {}
+    if treaties_df is not None and conflict_df is not None:
+        table.update(
+            _asof_organismality(
+                treaties_df, conflict_df, cutoffs, year_col, treaties_col, conflict_col
+            )
+        )
+    if target_df is not None and actual_df is not None:
+        table.update(
+            _asof_smf(target_df, actual_df, cutoffs, year_col, target_col, actual_col, k)
+        )
+    if skill_df is not None:
+        table.update(_asof_info_time(skill_df, cutoffs, year_col, skill_col))
+
+    return pd.DataFrame(table, index=pd.Index(cutoffs.astype(int), name="cutoff"))
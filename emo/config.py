@@ -35,9 +35,27 @@ CO2_ACTUAL_CSV = DATA_DIR / "co2_actual.csv"
 # Forecast skill for information-time
 ECMWF_SKILL_CSV = DATA_DIR / "ecmwf_headline_scores.csv"
 
+# Rendered figures (PNG files written by emo.render)
+FIGURES_DIR = BASE_DIR / "figures"
+RENDER_MAX_POINTS = 2000  # per line, after LTTB downsampling
+RENDER_WORKERS = None  # None -> os.cpu_count()
+
 # GWI defaults
 GWI_TOPIC_NAME = "IPCC"
 GWI_IGNITION_PERCENTILE = 95.0
+GWI_MAX_LAG_DAYS = 14
+
+# Streaming GWI (ticks, e.g. hours): sliding window length and warm-up
+GWI_STREAM_WINDOW = 24 * 28
+GWI_STREAM_MIN_HISTORY = 24
+
+# Pre-aggregated pyramid: default maximum number of buckets per range query
+PYRAMID_MAX_POINTS = 2000
+
+# Sharded execution (emo.sharding): keys per work unit, lease and retries
+SHARD_SIZE = 25
+SHARD_LEASE_SECONDS = 600.0
+SHARD_MAX_ATTEMPTS = 3
 
 # User agent string for future API calls (if you add them later)
 USER_AGENT = "EMO-v0.1 (contact: your_email@example.com)"  # <- replace with a real email
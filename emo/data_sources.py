@@ -1,10 +1,21 @@
 """
 Data loading helpers for EMO v0.1.
 
-These functions assume CSV files in the `data/` directory with simple
-structures. You can adapt them as needed.
+Every input CSV in the `data/` directory has a declarative schema in
+`SCHEMAS`: its config path, column names and dtypes, and the date format
+of any date column. Loads use that schema to:
 
-Example CSV schemas:
+- read only the declared columns (`usecols`) with explicit dtypes,
+- use the pyarrow CSV engine when it is installed (else pandas' C engine),
+- parse date columns once, so metrics receive datetime64 columns,
+- raise `SchemaError` for missing columns, bad values or bad dates,
+- drop rows whose key (year / date) is blank, noting how many.
+
+`validate_sources()` checks all sources up front and returns the issues,
+so a broken file is reported by name instead of surfacing later as a
+metric that silently returns None.
+
+CSV schemas:
 
 1. owid_treaties.csv
    year,treaty_parties
@@ -32,33 +43,196 @@ Example CSV schemas:
 
 9. ecmwf_headline_scores.csv
    year,skill
+
+(plus the optional conflict_deaths_for_synergy.csv, same schema as 2.)
 """
 
-from typing import Optional, Tuple
+import importlib.util
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 
 from . import config
 
+# Column dtype used in schemas for dates parsed with `date_format`
+DATE = "date"
+
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
+
+
+class SchemaError(ValueError):
+    """
+    Raised when a CSV does not match its declared schema.
+    """
+
+
+@dataclass(frozen=True)
+class SourceSchema:
+    name: str
+    config_attr: str
+    key: str
+    columns: Dict[str, str]
+    date_format: str = "%Y-%m-%d"
+    optional: bool = False
+
+    @property
+    def path(self) -> Path:
+        # Resolved on access so that overriding config paths keeps working
+        return Path(getattr(config, self.config_attr))
+
+
+def _yearly(name: str, config_attr: str, value_col: str, optional: bool = False) -> SourceSchema:
+    return SourceSchema(
+        name=name,
+        config_attr=config_attr,
+        key="year",
+        columns={"year": "int64", value_col: "float64"},
+        optional=optional,
+    )
+
+
+def _daily(name: str, config_attr: str, value_col: str) -> SourceSchema:
+    return SourceSchema(
+        name=name,
+        config_attr=config_attr,
+        key="date",
+        columns={"date": DATE, value_col: "float64"},
+    )
+
+
+SCHEMAS: Dict[str, SourceSchema] = {
+    s.name: s
+    for s in [
+        _yearly("treaties", "TREATIES_CSV", "treaty_parties"),
+        _yearly("conflict", "CONFLICT_CSV", "conflict_deaths"),
+        _yearly("news_yearly", "GDELT_NEWS_CSV", "news_count"),
+        _yearly("pubs_yearly", "OPENALEX_PUBS_CSV", "papers_count"),
+        _yearly(
+            "conflict_for_synergy", "CONFLICT_FOR_SYNERGY_CSV", "conflict_deaths", optional=True
+        ),
+        _daily("news_daily", "GDELT_NEWS_DAILY_CSV", "news_count"),
+        _daily("wiki_daily", "WIKIPEDIA_IPCC_CSV", "pageviews"),
+        _yearly("co2_target", "CO2_TARGET_CSV", "co2_target"),
+        _yearly("co2_actual", "CO2_ACTUAL_CSV", "co2_actual"),
+        _yearly("ecmwf_skill", "ECMWF_SKILL_CSV", "skill"),
+    ]
+}
+
+# (path, mtime, size) -> (parsed frame, notes), so validation and loading
+# parse once
+_CACHE: Dict[Tuple[str, int, int], Tuple[pd.DataFrame, List[str]]] = {}
+
 
-def _load_csv(path) -> Optional[pd.DataFrame]:
+def _read_with_schema(schema: SourceSchema) -> Tuple[pd.DataFrame, List[str]]:
     """
-    Internal helper to load a CSV if it exists, else return None.
+    Read and type-check a CSV against its schema (FileNotFoundError if absent).
+
+    Returns the frame and a list of notes about rows that were dropped.
     """
+    path = schema.path
+    st = os.stat(path)
+    cache_key = (str(path), st.st_mtime_ns, st.st_size)
+    if cache_key in _CACHE:
+        df, notes = _CACHE[cache_key]
+        return df.copy(), list(notes)
+
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [c for c in schema.columns if c not in header]
+    if missing:
+        raise SchemaError(
+            f"{path.name}: missing column(s) {missing}; found {list(header)}"
+        )
+
+    # Integer columns are read as nullable so that a blank key cell does not
+    # reject the whole file; those rows are dropped below
+    dtypes = {
+        c: ("string" if t == DATE else "Int64" if t == "int64" else t)
+        for c, t in schema.columns.items()
+    }
     try:
-        df = pd.read_csv(path)
+        df = pd.read_csv(path, usecols=list(schema.columns), dtype=dtypes, engine=CSV_ENGINE)
+    except (ValueError, TypeError) as exc:
+        raise SchemaError(f"{path.name}: values do not match {dtypes}: {exc}") from exc
+    df = df[list(schema.columns)]
+
+    for col, dtype in schema.columns.items():
+        if dtype != DATE:
+            continue
+        parsed = pd.to_datetime(df[col], format=schema.date_format, errors="coerce")
+        bad = parsed.isna() & df[col].notna()
+        if bad.any():
+            raise SchemaError(
+                f"{path.name}: {int(bad.sum())} value(s) in {col!r} do not match "
+                f"{schema.date_format!r}, e.g. {df.loc[bad, col].iloc[0]!r}"
+            )
+        df[col] = parsed
+
+    notes: List[str] = []
+    blank = df[schema.key].isna()
+    if blank.any():
+        notes.append(f"{path.name}: dropped {int(blank.sum())} row(s) with a blank {schema.key!r}")
+        df = df[~blank].reset_index(drop=True)
+    for col, dtype in schema.columns.items():
+        if dtype == "int64":
+            if df[col].isna().any():
+                raise SchemaError(f"{path.name}: blank value(s) in integer column {col!r}")
+            df[col] = df[col].astype("int64")
+
+    _CACHE[cache_key] = (df, notes)
+    return df.copy(), list(notes)
+
+
+def _load_csv(name: str) -> Optional[pd.DataFrame]:
+    """
+    Internal helper to load a registered source if it exists and matches
+    its schema, else warn and return None.
+    """
+    schema = SCHEMAS[name]
+    try:
+        df, _ = _read_with_schema(schema)
         return df
     except FileNotFoundError:
-        print(f"[WARN] CSV not found: {path}")
+        print(f"[WARN] CSV not found: {schema.path}")
+        return None
+    except SchemaError as exc:
+        print(f"[WARN] Schema violation in {schema.name}: {exc}")
         return None
 
 
+def validate_sources() -> Dict[str, List[str]]:
+    """
+    Check every registered source against its schema.
+
+    Returns
+    -------
+    dict mapping source name -> list of problems (empty if OK), including
+    notes about rows dropped for a blank key. Missing optional sources are
+    not reported.
+    """
+    issues: Dict[str, List[str]] = {}
+    for name, schema in SCHEMAS.items():
+        problems: List[str] = []
+        try:
+            _, notes = _read_with_schema(schema)
+            problems.extend(notes)
+        except FileNotFoundError:
+            if not schema.optional:
+                problems.append(f"CSV not found: {schema.path}")
+        except SchemaError as exc:
+            problems.append(str(exc))
+        issues[name] = problems
+    return issues
+
+
 def load_treaties() -> Optional[pd.DataFrame]:
-    return _load_csv(config.TREATIES_CSV)
+    return _load_csv("treaties")
 
 
 def load_conflict() -> Optional[pd.DataFrame]:
-    return _load_csv(config.CONFLICT_CSV)
+    return _load_csv("conflict")
 
 
 def load_synergy_streams() -> Tuple[
@@ -73,9 +247,9 @@ def load_synergy_streams() -> Tuple[
     -------
     (news_df, pubs_df, conflict_df)
     """
-    news = _load_csv(config.GDELT_NEWS_CSV)
-    pubs = _load_csv(config.OPENALEX_PUBS_CSV)
-    conflict = _load_csv(config.CONFLICT_FOR_SYNERGY_CSV)
+    news = _load_csv("news_yearly")
+    pubs = _load_csv("pubs_yearly")
+    conflict = _load_csv("conflict_for_synergy")
     return news, pubs, conflict
 
 
@@ -85,18 +259,18 @@ def load_gwi_streams() -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
     - news_df: with columns [date, news_count]
     - wiki_df: with columns [date, pageviews]
     """
-    news = _load_csv(config.GDELT_NEWS_DAILY_CSV)
-    wiki = _load_csv(config.WIKIPEDIA_IPCC_CSV)
+    news = _load_csv("news_daily")
+    wiki = _load_csv("wiki_daily")
     return news, wiki
 
 
 def load_co2_target() -> Optional[pd.DataFrame]:
-    return _load_csv(config.CO2_TARGET_CSV)
+    return _load_csv("co2_target")
 
 
 def load_co2_actual() -> Optional[pd.DataFrame]:
-    return _load_csv(config.CO2_ACTUAL_CSV)
+    return _load_csv("co2_actual")
 
 
 def load_ecmwf_skill() -> Optional[pd.DataFrame]:
-    return _load_csv(config.ECMWF_SKILL_CSV)
+    return _load_csv("ecmwf_skill")
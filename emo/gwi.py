@@ -12,12 +12,12 @@ We then:
 """
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence
 
 import numpy as np
 import pandas as pd
 
-from .utils import zscore, logistic
+from .utils import as_datetime, zscore, logistic
 from . import config
 
 
@@ -28,34 +28,29 @@ class GWIResult:
     ignition_events: pd.DataFrame
 
 
-def compute_gwi(
+def _ignition_frame(
     news_df: pd.DataFrame,
     wiki_df: pd.DataFrame,
-    date_col: str = "date",
-    news_col: str = "news_count",
-    wiki_col: str = "pageviews",
-    percentile: Optional[float] = None,
-) -> Optional[GWIResult]:
+    date_col: str,
+    news_col: str,
+    wiki_col: str,
+) -> pd.DataFrame:
     """
-    Compute GWI score and ignition events.
+    Merge the two streams and compute z-scores and the ignition score.
 
-    Expects daily dataframes with columns:
-    - news_df: [date, news_count]
-    - wiki_df: [date, pageviews]
+    This is everything in `compute_gwi` that does not depend on the
+    percentile, so sweeps can compute it once.
     """
-    if percentile is None:
-        percentile = config.GWI_IGNITION_PERCENTILE
-
     # Parse dates
     df_news = news_df[[date_col, news_col]].copy()
     df_wiki = wiki_df[[date_col, wiki_col]].copy()
 
-    df_news[date_col] = pd.to_datetime(df_news[date_col])
-    df_wiki[date_col] = pd.to_datetime(df_wiki[date_col])
+    df_news[date_col] = as_datetime(df_news[date_col])
+    df_wiki[date_col] = as_datetime(df_wiki[date_col])
 
     df = pd.merge(df_news, df_wiki, on=date_col, how="inner").dropna()
     if df.empty:
-        return None
+        return df
 
     # Z-scores
     df["news_z"] = zscore(df[news_col])
@@ -64,6 +59,30 @@ def compute_gwi(
     # Ignition: logistic of sum
     df["ignition_raw"] = df["news_z"] + df["wiki_z"]
     df["ignition"] = logistic(df["ignition_raw"].values)
+    return df
+
+
+def compute_gwi(
+    news_df: pd.DataFrame,
+    wiki_df: pd.DataFrame,
+    date_col: str = "date",
+    news_col: str = "news_count",
+    wiki_col: str = "pageviews",
+    percentile: Optional[float] = None,
+) -> Optional[GWIResult]:
+    """
+    Compute GWI score and ignition events.
+
+    Expects daily dataframes with columns:
+    - news_df: [date, news_count]
+    - wiki_df: [date, pageviews]
+    """
+    if percentile is None:
+        percentile = config.GWI_IGNITION_PERCENTILE
+
+    df = _ignition_frame(news_df, wiki_df, date_col, news_col, wiki_col)
+    if df.empty:
+        return None
 
     # Threshold by percentile
     thresh = float(np.percentile(df["ignition"], percentile))
@@ -76,3 +95,48 @@ def compute_gwi(
         threshold=thresh,
         ignition_events=events,
     )
+
+
+def sweep_gwi_percentile(
+    news_df: pd.DataFrame,
+    wiki_df: pd.DataFrame,
+    percentiles: Sequence[float],
+    date_col: str = "date",
+    news_col: str = "news_count",
+    wiki_col: str = "pageviews",
+) -> Optional[pd.DataFrame]:
+    """
+    Evaluate `compute_gwi` for many ignition percentiles in one pass.
+
+    The merge, z-scores and ignition score are computed once and sorted;
+    all percentile thresholds and their event counts (binary search) are
+    then read off the sorted scores.
+
+    Returns
+    -------
+    pd.DataFrame with [percentile, threshold, n_events, event_fraction],
+    one row per requested percentile, or None if the streams do not overlap.
+    """
+    df = _ignition_frame(news_df, wiki_df, date_col, news_col, wiki_col)
+    if df.empty:
+        return None
+
+    scores = np.sort(df["ignition"].to_numpy(dtype=float))
+    n = len(scores)
+    q = np.atleast_1d(np.asarray(percentiles, dtype=float))
+
+    # One vectorized call over the sorted scores (same interpolation and
+    # rounding as compute_gwi); the partition step is then trivial.
+    thresholds = np.percentile(scores, q)
+
+    # Events are scores >= threshold
+    n_events = n - np.searchsorted(scores, thresholds, side="left")
+
+    return pd.DataFrame(
+        {
+            "percentile": q,
+            "threshold": thresholds,
+            "n_events": n_events,
+            "event_fraction": n_events / n,
+        }
+    )
@@ -0,0 +1,246 @@
+"""
+Lead/lag analysis between the GWI streams for EMO v0.1.
+
+`compute_gwi` adds news and search z-scores for the same day, but news
+coverage often leads search interest by a few days. Here we:
+
+- Reindex each topic's news and pageview streams onto a common daily grid.
+- Compute the full normalized cross-correlation function (CCF) for every
+  topic at once via zero-padded FFTs (O(n log n) per topic).
+- Report the dominant lag (positive lag = news leads search).
+- Optionally rebuild a lag-aligned ignition score:
+  ignition = logistic(news_z(t - lag) + search_z(t)).
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .utils import as_datetime, logistic
+from . import config
+
+
+@dataclass
+class GWILagResult:
+    lags: pd.DataFrame
+    ccf: pd.DataFrame
+    aligned: Optional[pd.DataFrame]
+
+
+def _next_pow2(n: int) -> int:
+    return 1 << max(int(n) - 1, 0).bit_length()
+
+
+def cross_correlation_fft(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_lag: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Normalized cross-correlation of x and y for lags in [-max_lag, max_lag].
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Arrays of shape (n,) or (m, n); each row is one series. NaNs are
+        treated as missing and contribute nothing to the sums.
+    max_lag : int, optional
+        Largest absolute lag to return. Defaults to n - 1.
+
+    Returns
+    -------
+    lags : np.ndarray
+        Integer lags, shape (2 * max_lag + 1,).
+    ccf : np.ndarray
+        Correlations, shape (m, 2 * max_lag + 1) (or 1-D for 1-D input).
+        ccf[..., lag] pairs x[t] with y[t + lag], so a peak at a positive
+        lag means x leads y.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    squeeze = x.ndim == 1
+    x = np.atleast_2d(x)
+    y = np.atleast_2d(y)
+    if x.shape != y.shape:
+        raise ValueError(f"x and y must have the same shape, got {x.shape} and {y.shape}")
+
+    n = x.shape[1]
+    if max_lag is None:
+        max_lag = n - 1
+    max_lag = int(min(max(max_lag, 0), max(n - 1, 0)))
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    # Center on observed values, then zero out missing days
+    with np.errstate(invalid="ignore"):
+        x = x - np.nanmean(x, axis=1, keepdims=True)
+        y = y - np.nanmean(y, axis=1, keepdims=True)
+    x = np.nan_to_num(x, nan=0.0)
+    y = np.nan_to_num(y, nan=0.0)
+
+    # Zero-padding to >= 2n - 1 turns circular correlation into linear
+    nfft = _next_pow2(2 * n - 1)
+    fx = np.fft.rfft(x, nfft, axis=1)
+    fy = np.fft.rfft(y, nfft, axis=1)
+    cc = np.fft.irfft(np.conj(fx) * fy, nfft, axis=1)
+    cc = np.concatenate([cc[:, nfft - max_lag:], cc[:, : max_lag + 1]], axis=1)
+
+    norm = np.sqrt(np.sum(x * x, axis=1) * np.sum(y * y, axis=1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ccf = np.where(norm[:, None] > 0, cc / norm[:, None], 0.0)
+
+    return lags, (ccf[0] if squeeze else ccf)
+
+
+def dominant_lag(lags: np.ndarray, ccf: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lag of the highest correlation per row; ties go to the smallest |lag|.
+    """
+    ccf = np.atleast_2d(ccf)
+    order = np.argsort(np.abs(lags), kind="stable")
+    best = order[np.argmax(ccf[:, order], axis=1)]
+    return lags[best], ccf[np.arange(ccf.shape[0]), best]
+
+
+def _wide_daily(
+    df: pd.DataFrame,
+    date_col: str,
+    value_col: str,
+    topic_col: Optional[str],
+) -> pd.DataFrame:
+    """
+    Pivot a long [date, (topic), value] frame to dates x topics.
+    """
+    cols = [date_col, value_col] + ([topic_col] if topic_col else [])
+    d = df[cols].copy()
+    d[date_col] = as_datetime(d[date_col])
+    if topic_col is None:
+        d["_topic"] = config.GWI_TOPIC_NAME
+        topic_col = "_topic"
+    d[value_col] = d[value_col].astype(float)
+    # Missing values stay missing (NaN after reindexing), not zero counts
+    d = d.dropna(subset=[value_col])
+    return d.pivot_table(index=date_col, columns=topic_col, values=value_col, aggfunc="sum")
+
+
+def compute_gwi_lag(
+    news_df: pd.DataFrame,
+    wiki_df: pd.DataFrame,
+    date_col: str = "date",
+    news_col: str = "news_count",
+    wiki_col: str = "pageviews",
+    topic_col: Optional[str] = None,
+    max_lag: Optional[int] = None,
+    align: bool = False,
+) -> Optional[GWILagResult]:
+    """
+    Cross-correlate news and search streams for one or many topics.
+
+    Expects daily dataframes with columns:
+    - news_df: [date, news_count] (+ topic_col for batches)
+    - wiki_df: [date, pageviews] (+ topic_col for batches)
+
+    Returns
+    -------
+    GWILagResult, or None if no topic has at least two shared days.
+    Topics with fewer than two shared days are left out.
+    - lags: one row per topic with [topic, lag, peak_corr, zero_lag_corr, n_days].
+    - ccf: topics x lags correlation table.
+    - aligned: if align=True, long [topic, date, news_z, wiki_z,
+      ignition_raw, ignition] using news shifted by each topic's lag.
+    """
+    if max_lag is None:
+        max_lag = config.GWI_MAX_LAG_DAYS
+
+    news_w = _wide_daily(news_df, date_col, news_col, topic_col)
+    wiki_w = _wide_daily(wiki_df, date_col, wiki_col, topic_col)
+
+    topics = news_w.columns.intersection(wiki_w.columns)
+    if len(topics) == 0 or news_w.empty or wiki_w.empty:
+        return None
+
+    start = min(news_w.index.min(), wiki_w.index.min())
+    end = max(news_w.index.max(), wiki_w.index.max())
+    days = pd.date_range(start, end, freq="D")
+    news_m = news_w.reindex(index=days, columns=topics).to_numpy().T
+    wiki_m = wiki_w.reindex(index=days, columns=topics).to_numpy().T
+
+    # Only days where both streams are present, as in compute_gwi's inner join
+    both = np.isfinite(news_m) & np.isfinite(wiki_m)
+    news_m = np.where(both, news_m, np.nan)
+    wiki_m = np.where(both, wiki_m, np.nan)
+    n_days = both.sum(axis=1)
+
+    # A correlation needs at least two shared days; drop other topics
+    keep = n_days >= 2
+    if not keep.any():
+        return None
+    topics = topics[keep]
+    news_m, wiki_m, n_days = news_m[keep], wiki_m[keep], n_days[keep]
+
+    lags, ccf = cross_correlation_fft(news_m, wiki_m, max_lag=max_lag)
+    best_lag, peak = dominant_lag(lags, ccf)
+    zero_idx = int(np.searchsorted(lags, 0))
+
+    topic_index = pd.Index(topics, name="topic")
+    lag_table = pd.DataFrame(
+        {
+            "topic": topic_index,
+            "lag": best_lag,
+            "peak_corr": peak,
+            "zero_lag_corr": ccf[:, zero_idx],
+            "n_days": n_days,
+        }
+    )
+    ccf_table = pd.DataFrame(ccf, index=topic_index, columns=pd.Index(lags, name="lag"))
+
+    aligned = None
+    if align:
+        aligned = _aligned_ignition(news_m, wiki_m, best_lag, topic_index, days, date_col)
+
+    return GWILagResult(lags=lag_table, ccf=ccf_table, aligned=aligned)
+
+
+def _aligned_ignition(
+    news_m: np.ndarray,
+    wiki_m: np.ndarray,
+    best_lag: np.ndarray,
+    topics: pd.Index,
+    days: pd.DatetimeIndex,
+    date_col: str,
+) -> pd.DataFrame:
+    """
+    Ignition score with each topic's news stream shifted by its dominant lag.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        news_z = (news_m - np.nanmean(news_m, axis=1, keepdims=True)) / np.nanstd(
+            news_m, axis=1, ddof=1, keepdims=True
+        )
+        wiki_z = (wiki_m - np.nanmean(wiki_m, axis=1, keepdims=True)) / np.nanstd(
+            wiki_m, axis=1, ddof=1, keepdims=True
+        )
+    # zscore() convention: constant series -> 0
+    news_z = np.where(np.isfinite(news_m) & ~np.isfinite(news_z), 0.0, news_z)
+    wiki_z = np.where(np.isfinite(wiki_m) & ~np.isfinite(wiki_z), 0.0, wiki_z)
+
+    shifted = np.full_like(news_z, np.nan)
+    n = news_z.shape[1]
+    for i, lag in enumerate(best_lag):
+        lag = int(lag)
+        if lag >= 0:
+            shifted[i, lag:] = news_z[i, : n - lag]
+        else:
+            shifted[i, :lag] = news_z[i, -lag:]
+
+    out = pd.DataFrame(
+        {
+            "topic": np.repeat(topics.to_numpy(), n),
+            date_col: np.tile(days.to_numpy(), len(topics)),
+            "news_z": shifted.ravel(),
+            "wiki_z": wiki_z.ravel(),
+        }
+    ).dropna()
+    out["ignition_raw"] = out["news_z"] + out["wiki_z"]
+    out["ignition"] = logistic(out["ignition_raw"].values)
+    return out.reset_index(drop=True)
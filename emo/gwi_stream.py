@@ -0,0 +1,420 @@
+"""
+Streaming Global Workspace Ignition (GWI) detector for EMO v0.1.
+
+`compute_gwi` thresholds against a percentile of the whole history, which
+only works in batch. Here we consume ticks (e.g. hourly news counts and
+pageviews) one at a time and keep everything over a sliding window of
+the last `window` ticks:
+
+- Z-score each stream against the window's running mean / std.
+- ignition = logistic(news_z + search_z), as in `compute_gwi`.
+- Threshold = window percentile of ignition, maintained by a two-heap
+  order-statistics structure (O(log w) per tick, O(w) memory).
+- Contiguous runs above threshold become episodes with start/end events.
+
+`replay_gwi_stream` pushes historical CSV rows through the detector as
+fast as possible for backtesting.
+"""
+
+import heapq
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .utils import as_datetime
+from . import config
+
+
+class SlidingPercentile:
+    """
+    Percentile of the last `window` values, matching np.percentile's
+    default linear interpolation.
+
+    For n values the target rank is h = (n - 1) * q / 100. We keep the
+    k + 1 smallest values (k = floor(h)) in a max-heap `low` and the rest
+    in a min-heap `high`, so the two order statistics needed for
+    interpolation are the heap tops. Evicted values are deleted lazily;
+    once more than `window` dead entries have piled up inside the heaps,
+    both heaps are rebuilt from the live window. That keeps memory O(w)
+    and updates O(log w) amortized.
+    """
+
+    def __init__(self, window: int, percentile: float) -> None:
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        if not 0.0 <= percentile <= 100.0:
+            raise ValueError("percentile must be in [0, 100]")
+        self.window = int(window)
+        self.percentile = float(percentile)
+        self._values: Deque[float] = deque()
+        self._low: List[float] = []  # negated values (max-heap)
+        self._high: List[float] = []
+        self._low_size = 0
+        self._high_size = 0
+        self._low_dead: Dict[float, int] = {}
+        self._high_dead: Dict[float, int] = {}
+        self._n_dead = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @staticmethod
+    def _forget(dead: Dict[float, int], v: float) -> None:
+        if dead[v] == 1:
+            del dead[v]
+        else:
+            dead[v] -= 1
+
+    def _prune(self) -> None:
+        while self._low and -self._low[0] in self._low_dead:
+            self._forget(self._low_dead, -heapq.heappop(self._low))
+            self._n_dead -= 1
+        while self._high and self._high[0] in self._high_dead:
+            self._forget(self._high_dead, heapq.heappop(self._high))
+            self._n_dead -= 1
+
+    def _rebuild(self) -> None:
+        """
+        Rebuild both heaps from the live window, dropping dead entries.
+        """
+        values = sorted(self._values)
+        target = self._target_low_size()
+        self._low = [-v for v in reversed(values[:target])]  # sorted -> valid heap
+        self._high = values[target:]
+        self._low_size = len(self._low)
+        self._high_size = len(self._high)
+        self._low_dead.clear()
+        self._high_dead.clear()
+        self._n_dead = 0
+
+    def _target_low_size(self) -> int:
+        n = len(self._values)
+        return int(math.floor((n - 1) * self.percentile / 100.0)) + 1 if n else 0
+
+    def _rebalance(self) -> None:
+        target = self._target_low_size()
+        self._prune()
+        while self._low_size > target:
+            v = -heapq.heappop(self._low)
+            heapq.heappush(self._high, v)
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune()
+        while self._low_size < target:
+            v = heapq.heappop(self._high)
+            heapq.heappush(self._low, -v)
+            self._high_size -= 1
+            self._low_size += 1
+            self._prune()
+
+    def push(self, value: float) -> None:
+        value = float(value)
+        if len(self._values) == self.window:
+            old = self._values.popleft()
+            if self._low and old <= -self._low[0]:
+                self._low_dead[old] = self._low_dead.get(old, 0) + 1
+                self._low_size -= 1
+            else:
+                self._high_dead[old] = self._high_dead.get(old, 0) + 1
+                self._high_size -= 1
+            self._n_dead += 1
+            self._prune()
+
+        self._values.append(value)
+        if self._low and value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, value)
+            self._high_size += 1
+        self._rebalance()
+
+        if self._n_dead > self.window:
+            self._rebuild()
+
+    def value(self) -> Optional[float]:
+        n = len(self._values)
+        if n == 0:
+            return None
+        lo = -self._low[0]
+        if self._high_size == 0:
+            return lo
+        h = (n - 1) * self.percentile / 100.0
+        frac = h - math.floor(h)
+        return lo + frac * (self._high[0] - lo)
+
+
+class _SlidingMoments:
+    """
+    Running mean / sample std of the last `window` values.
+
+    Sums are kept of deviations from a reference value, which is reset to
+    the window mean (with exact two-pass sums) every `window` pushes and
+    whenever the running sums have lost too much precision. This bounds
+    the drift of the add/subtract accumulators on endless streams at
+    O(1) amortized cost per push.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = int(window)
+        self._values: Deque[float] = deque()
+        self._ref = 0.0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._since_reset = 0
+
+    def _reset(self) -> None:
+        n = len(self._values)
+        self._ref = math.fsum(self._values) / n if n else 0.0
+        self._sum = math.fsum(v - self._ref for v in self._values)
+        self._sumsq = math.fsum((v - self._ref) ** 2 for v in self._values)
+        self._since_reset = 0
+
+    def push(self, value: float) -> None:
+        if len(self._values) == self.window:
+            d = self._values.popleft() - self._ref
+            self._sum -= d
+            self._sumsq -= d * d
+        self._values.append(value)
+        d = value - self._ref
+        self._sum += d
+        self._sumsq += d * d
+
+        self._since_reset += 1
+        if self._since_reset >= self.window:
+            self._reset()
+
+    def _variance(self) -> float:
+        n = len(self._values)
+        mean_d = self._sum / n
+        return (self._sumsq - n * mean_d * mean_d) / (n - 1)
+
+    def zscore(self, value: float) -> float:
+        """
+        Z-score of `value` against the window; 0 for constant windows,
+        as in utils.zscore.
+        """
+        n = len(self._values)
+        if n < 2:
+            return 0.0
+        var = self._variance()
+        # sumsq - n * mean^2 cancels badly when the values sit far from the
+        # reference; recompute exactly around the current mean
+        if var < 1e-9 * self._sumsq / n:
+            self._reset()
+            var = self._variance()
+        if var <= 0.0:
+            return 0.0
+        mean = self._ref + self._sum / n
+        return (value - mean) / math.sqrt(var)
+
+
+@dataclass
+class IgnitionEvent:
+    kind: str  # "start" or "end"
+    timestamp: Any
+    ignition: float
+    threshold: float
+
+
+@dataclass
+class IgnitionEpisode:
+    start: Any
+    end: Any
+    n_ticks: int
+    peak_ignition: float
+    peak_timestamp: Any
+
+
+@dataclass
+class GWIStreamResult:
+    ticks: pd.DataFrame
+    events: List[IgnitionEvent]
+    episodes: List[IgnitionEpisode]
+
+
+class StreamingIgnitionDetector:
+    """
+    Tick-by-tick GWI detector with bounded memory.
+
+    Parameters
+    ----------
+    window : int
+        Number of most recent ticks used for z-scores and the percentile.
+    percentile : float
+        Ignition threshold percentile within the window.
+    min_history : int
+        Ticks to observe before any ignition can be flagged.
+    """
+
+    def __init__(
+        self,
+        window: Optional[int] = None,
+        percentile: Optional[float] = None,
+        min_history: Optional[int] = None,
+    ) -> None:
+        if window is None:
+            window = config.GWI_STREAM_WINDOW
+        if percentile is None:
+            percentile = config.GWI_IGNITION_PERCENTILE
+        if min_history is None:
+            min_history = config.GWI_STREAM_MIN_HISTORY
+
+        self.min_history = int(min_history)
+        self._news = _SlidingMoments(window)
+        self._wiki = _SlidingMoments(window)
+        self._threshold = SlidingPercentile(window, percentile)
+        self._n_seen = 0
+
+        self._active: Optional[Dict[str, Any]] = None
+        self._last_timestamp: Any = None
+        self.episodes: List[IgnitionEpisode] = []
+
+    @property
+    def in_ignition(self) -> bool:
+        return self._active is not None
+
+    def update(self, timestamp: Any, news: float, pageviews: float) -> Dict[str, Any]:
+        """
+        Consume one tick.
+
+        Returns
+        -------
+        dict with [timestamp, ignition, threshold, is_ignition, events];
+        `events` lists the IgnitionEvent objects emitted by this tick.
+
+        Ticks with a missing or non-finite value are skipped: the window
+        and any open episode are left unchanged, ignition is NaN and
+        is_ignition is False.
+        """
+        news = float(news)
+        pageviews = float(pageviews)
+        if not (math.isfinite(news) and math.isfinite(pageviews)):
+            current = self._threshold.value()
+            return {
+                "timestamp": timestamp,
+                "ignition": float("nan"),
+                "threshold": float("nan") if current is None else float(current),
+                "is_ignition": False,
+                "events": [],
+            }
+
+        self._news.push(news)
+        self._wiki.push(pageviews)
+        self._n_seen += 1
+
+        raw = self._news.zscore(news) + self._wiki.zscore(pageviews)
+        ignition = float(1.0 / (1.0 + math.exp(-raw)))
+        self._threshold.push(ignition)
+        threshold = float(self._threshold.value())
+
+        is_ignition = self._n_seen >= self.min_history and ignition >= threshold
+
+        events: List[IgnitionEvent] = []
+        if is_ignition and self._active is None:
+            self._active = {
+                "start": timestamp,
+                "n_ticks": 0,
+                "peak_ignition": ignition,
+                "peak_timestamp": timestamp,
+            }
+            events.append(IgnitionEvent("start", timestamp, ignition, threshold))
+        if is_ignition:
+            self._active["n_ticks"] += 1
+            if ignition > self._active["peak_ignition"]:
+                self._active["peak_ignition"] = ignition
+                self._active["peak_timestamp"] = timestamp
+        elif self._active is not None:
+            events.append(self._close(timestamp, ignition, threshold))
+
+        self._last_timestamp = timestamp
+        return {
+            "timestamp": timestamp,
+            "ignition": ignition,
+            "threshold": threshold,
+            "is_ignition": is_ignition,
+            "events": events,
+        }
+
+    def _close(self, timestamp: Any, ignition: float, threshold: float) -> IgnitionEvent:
+        active = self._active
+        self._active = None
+        self.episodes.append(
+            IgnitionEpisode(
+                start=active["start"],
+                end=self._last_timestamp,
+                n_ticks=active["n_ticks"],
+                peak_ignition=active["peak_ignition"],
+                peak_timestamp=active["peak_timestamp"],
+            )
+        )
+        return IgnitionEvent("end", timestamp, ignition, threshold)
+
+    def flush(self) -> List[IgnitionEvent]:
+        """
+        Close an episode still open at the end of the stream.
+        """
+        if self._active is None:
+            return []
+        return [self._close(self._last_timestamp, float("nan"), float("nan"))]
+
+
+def replay_gwi_stream(
+    news_df: pd.DataFrame,
+    wiki_df: pd.DataFrame,
+    date_col: str = "date",
+    news_col: str = "news_count",
+    wiki_col: str = "pageviews",
+    window: Optional[int] = None,
+    percentile: Optional[float] = None,
+    min_history: Optional[int] = None,
+) -> Optional[GWIStreamResult]:
+    """
+    Replay historical streams through a StreamingIgnitionDetector.
+
+    Rows are joined on `date_col` like `compute_gwi` and fed in time order
+    with no pacing, so backtests run as fast as the detector allows.
+    """
+    df_news = news_df[[date_col, news_col]].copy()
+    df_wiki = wiki_df[[date_col, wiki_col]].copy()
+    df_news[date_col] = as_datetime(df_news[date_col])
+    df_wiki[date_col] = as_datetime(df_wiki[date_col])
+
+    df = pd.merge(df_news, df_wiki, on=date_col, how="inner").dropna()
+    if df.empty:
+        return None
+    df = df.sort_values(date_col, kind="stable")
+
+    detector = StreamingIgnitionDetector(window, percentile, min_history)
+    n = len(df)
+    ignition = np.empty(n)
+    threshold = np.empty(n)
+    flagged = np.empty(n, dtype=bool)
+    events: List[IgnitionEvent] = []
+
+    times = df[date_col].tolist()
+    for i, (ts, nv, wv) in enumerate(
+        zip(times, df[news_col].to_numpy(float), df[wiki_col].to_numpy(float))
+    ):
+        tick = detector.update(ts, nv, wv)
+        ignition[i] = tick["ignition"]
+        threshold[i] = tick["threshold"]
+        flagged[i] = tick["is_ignition"]
+        events.extend(tick["events"])
+    events.extend(detector.flush())
+
+    ticks = pd.DataFrame(
+        {
+            date_col: df[date_col].to_numpy(),
+            news_col: df[news_col].to_numpy(),
+            wiki_col: df[wiki_col].to_numpy(),
+            "ignition": ignition,
+            "threshold": threshold,
+            "is_ignition": flagged,
+        }
+    )
+    return GWIStreamResult(ticks=ticks, events=events, episodes=detector.episodes)
@@ -0,0 +1,253 @@
+"""
+Multi-resolution pre-aggregation of daily series for EMO v0.1.
+
+Dashboards zoom GWI series from decades down to single days. Instead of
+shipping every daily point, we keep a pyramid of buckets:
+
+    day -> week -> month -> year
+
+Each bucket stores count / sum / min / max per column, so mean, min and
+max can be served at any zoom. New days are folded into every level as
+they arrive; re-sent days overwrite the old value and only the affected
+coarser buckets are rebuilt.
+
+A range query first picks the finest level whose bucket count in the
+range fits `max_points`, then slices that level by binary search, so it
+touches O(points shown) buckets.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from . import config
+from .gwi import GWIResult
+from .utils import as_datetime
+
+# Level name -> pandas period frequency, finest first
+LEVELS: Dict[str, str] = {
+    "day": "D",
+    "week": "W",
+    "month": "M",
+    "year": "Y",
+}
+
+# Row indices of the per-bucket aggregate array
+_COUNT, _SUM, _MIN, _MAX = range(4)
+
+
+class SeriesPyramid:
+    """
+    Incrementally maintained day/week/month/year aggregates for daily data.
+
+    Parameters
+    ----------
+    columns : sequence of str
+        Value columns to aggregate.
+    date_col : str
+        Name of the date column in frames passed to `update`.
+    """
+
+    def __init__(self, columns: Sequence[str], date_col: str = "date") -> None:
+        self.columns = list(columns)
+        self.date_col = date_col
+        # Per level: sorted period ordinals, ordinal -> (4, n_cols) aggregates,
+        # ordinal -> bucket start timestamp
+        self._keys: Dict[str, List[int]] = {lvl: [] for lvl in LEVELS}
+        self._agg: Dict[str, Dict[int, np.ndarray]] = {lvl: {} for lvl in LEVELS}
+        self._start: Dict[str, Dict[int, pd.Timestamp]] = {lvl: {} for lvl in LEVELS}
+
+    def __len__(self) -> int:
+        return len(self._keys["day"])
+
+    def n_buckets(self, level: str) -> int:
+        return len(self._keys[level])
+
+    def update(self, df: pd.DataFrame) -> None:
+        """
+        Fold a batch of daily rows into the pyramid.
+
+        Rows for days already stored replace the old values. If a batch
+        contains the same day twice, the last row wins.
+        """
+        d = df[[self.date_col] + self.columns].copy()
+        if d.empty:
+            return
+        d[self.date_col] = as_datetime(d[self.date_col]).dt.normalize()
+        d = d.drop_duplicates(subset=self.date_col, keep="last").sort_values(self.date_col)
+
+        dates = pd.DatetimeIndex(d[self.date_col])
+        values = d[self.columns].to_numpy(dtype=float)
+        valid = np.isfinite(values)
+
+        day_ord = pd.PeriodIndex(dates, freq=LEVELS["day"]).asi8
+        day_agg = self._agg["day"]
+        is_new = np.array([o not in day_agg for o in day_ord], dtype=bool)
+
+        # Day level: one bucket per day
+        for i, o in enumerate(day_ord):
+            row = np.empty((4, len(self.columns)))
+            row[_COUNT] = valid[i]
+            row[_SUM] = np.where(valid[i], values[i], 0.0)
+            row[_MIN] = np.where(valid[i], values[i], np.inf)
+            row[_MAX] = np.where(valid[i], values[i], -np.inf)
+            if is_new[i]:
+                insort(self._keys["day"], int(o))
+                self._start["day"][int(o)] = dates[i]
+            day_agg[int(o)] = row
+
+        for level, freq in LEVELS.items():
+            if level == "day":
+                continue
+            ords = pd.PeriodIndex(dates, freq=freq).asi8
+
+            # Buckets touched by replaced days are rebuilt from the day level
+            # (which already holds this batch); the rest are merged.
+            dirty = set(int(o) for o in ords[~is_new])
+            for o in sorted(dirty):
+                self._rebuild(level, freq, o)
+
+            if not is_new.any():
+                continue
+            new = pd.DataFrame(values[is_new], columns=self.columns)
+            new["_bucket"] = ords[is_new]
+            grouped = new.groupby("_bucket", sort=True)[self.columns]
+            stats = np.stack(
+                [
+                    grouped.count().to_numpy(dtype=float),
+                    grouped.sum(min_count=0).to_numpy(dtype=float),
+                    grouped.min().fillna(np.inf).to_numpy(dtype=float),
+                    grouped.max().fillna(-np.inf).to_numpy(dtype=float),
+                ],
+                axis=1,
+            )
+            for o, row in zip(grouped.count().index, stats):
+                if int(o) not in dirty:
+                    self._merge(level, int(o), row)
+
+    def _merge(self, level: str, ordinal: int, row: np.ndarray) -> None:
+        agg = self._agg[level]
+        cur = agg.get(ordinal)
+        if cur is None:
+            insort(self._keys[level], ordinal)
+            self._start[level][ordinal] = pd.Period(ordinal=ordinal, freq=LEVELS[level]).start_time
+            agg[ordinal] = row
+            return
+        cur[_COUNT] += row[_COUNT]
+        cur[_SUM] += row[_SUM]
+        cur[_MIN] = np.minimum(cur[_MIN], row[_MIN])
+        cur[_MAX] = np.maximum(cur[_MAX], row[_MAX])
+
+    def _rebuild(self, level: str, freq: str, ordinal: int) -> None:
+        period = pd.Period(ordinal=ordinal, freq=freq)
+        lo_day = pd.Period(period.start_time, freq=LEVELS["day"]).ordinal
+        hi_day = pd.Period(period.end_time, freq=LEVELS["day"]).ordinal
+        day_keys = self._keys["day"]
+        lo = bisect_left(day_keys, lo_day)
+        hi = bisect_right(day_keys, hi_day)
+        rows = np.stack([self._agg["day"][o] for o in day_keys[lo:hi]])
+        row = np.stack(
+            [
+                rows[:, _COUNT].sum(axis=0),
+                rows[:, _SUM].sum(axis=0),
+                rows[:, _MIN].min(axis=0),
+                rows[:, _MAX].max(axis=0),
+            ]
+        )
+        if ordinal not in self._agg[level]:
+            insort(self._keys[level], ordinal)
+            self._start[level][ordinal] = period.start_time
+        self._agg[level][ordinal] = row
+
+    def _range(self, level: str, start, end) -> slice:
+        keys = self._keys[level]
+        freq = LEVELS[level]
+        lo = 0 if start is None else bisect_left(keys, pd.Period(start, freq=freq).ordinal)
+        hi = len(keys) if end is None else bisect_right(keys, pd.Period(end, freq=freq).ordinal)
+        return slice(lo, max(lo, hi))
+
+    def choose_level(self, start=None, end=None, max_points: Optional[int] = None) -> str:
+        """
+        Finest level with at most `max_points` buckets in [start, end];
+        the coarsest level if none fits.
+        """
+        if max_points is None:
+            max_points = config.PYRAMID_MAX_POINTS
+        for level in LEVELS:
+            rng = self._range(level, start, end)
+            if rng.stop - rng.start <= max_points:
+                return level
+        return list(LEVELS)[-1]
+
+    def query(
+        self,
+        start=None,
+        end=None,
+        level: Optional[str] = None,
+        max_points: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Aggregated view of [start, end] (inclusive, by bucket).
+
+        Returns
+        -------
+        pd.DataFrame with [period_start, level] and, per column c,
+        [c_min, c_max, c_mean, c_count]. Buckets with no valid values
+        for c have NaN min/max/mean.
+        """
+        if level is None:
+            level = self.choose_level(start, end, max_points)
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level {level!r}; expected one of {list(LEVELS)}")
+
+        keys = self._keys[level][self._range(level, start, end)]
+        out = pd.DataFrame(
+            {
+                "period_start": pd.DatetimeIndex([self._start[level][o] for o in keys]),
+                "level": level,
+            }
+        )
+        if not keys:
+            for c in self.columns:
+                for stat in ("min", "max", "mean", "count"):
+                    out[f"{c}_{stat}"] = pd.Series(dtype=float)
+            return out
+
+        rows = np.stack([self._agg[level][o] for o in keys])
+        count = rows[:, _COUNT]
+        has = count > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(has, rows[:, _SUM] / count, np.nan)
+        vmin = np.where(has, rows[:, _MIN], np.nan)
+        vmax = np.where(has, rows[:, _MAX], np.nan)
+
+        for j, c in enumerate(self.columns):
+            out[f"{c}_min"] = vmin[:, j]
+            out[f"{c}_max"] = vmax[:, j]
+            out[f"{c}_mean"] = mean[:, j]
+            out[f"{c}_count"] = count[:, j].astype(int)
+        return out
+
+
+def build_gwi_pyramid(
+    result: GWIResult,
+    date_col: str = "date",
+    columns: Sequence[str] = ("news_count", "pageviews", "ignition"),
+) -> SeriesPyramid:
+    """
+    Pyramid over a `compute_gwi` time series (raw streams and ignition).
+
+    `news_count` and `pageviews` are raw counts, so a pyramid built with
+    only those columns can be extended by calling `.update()` with new rows.
+    `ignition` is not like that: it is a logistic of z-scores over the whole
+    history, so every new `compute_gwi` run rescales all past days. After
+    each run, pass the full `result.time_series` to `.update()`, which
+    replaces every day and rebuilds all buckets, or build a new pyramid.
+    Never append only the new ignition rows.
+    """
+    cols = [c for c in columns if c in result.time_series.columns]
+    pyramid = SeriesPyramid(cols, date_col=date_col)
+    pyramid.update(result.time_series)
+    return pyramid
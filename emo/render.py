@@ -0,0 +1,211 @@
+"""
+Batch figure rendering for EMO v0.1.
+
+Metric runs describe their plots as `FigureSpec`s instead of drawing them.
+Once all numbers are printed, `render_figures` writes every figure to a
+PNG file:
+
+- Each figure is drawn with matplotlib's Agg canvas (no pyplot, no GUI),
+  in a pool of worker processes.
+- Long series are downsampled with Largest-Triangle-Three-Buckets (LTTB),
+  which keeps the visual shape (peaks, troughs) of millions of points
+  with a few thousand.
+- Each figure reports its render time and point counts.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from . import config
+
+
+@dataclass
+class LineSpec:
+    x: np.ndarray
+    y: np.ndarray
+    label: Optional[str] = None
+    marker: Optional[str] = None
+
+
+@dataclass
+class FigureSpec:
+    name: str
+    title: str
+    xlabel: str
+    ylabel: str
+    lines: List[LineSpec]
+    hlines: List[float] = field(default_factory=list)
+
+
+@dataclass
+class RenderResult:
+    name: str
+    path: Optional[Path]
+    seconds: float
+    points_in: int
+    points_out: int
+    error: Optional[str] = None
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Numeric series of equal length, x sorted ascending.
+    n_out : int
+        Target number of points (>= 3).
+
+    Returns
+    -------
+    np.ndarray
+        Sorted indices of the retained points (first and last always kept).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    idx = np.empty(n_out, dtype=int)
+    idx[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        # Average of the next bucket is the third triangle vertex
+        nxt_lo = int(np.floor((i + 1) * every)) + 1
+        nxt_hi = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+
+        lo = int(np.floor(i * every)) + 1
+        hi = int(np.floor((i + 1) * every)) + 1
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    idx[-1] = n - 1
+    return idx
+
+
+def _downsample(x: np.ndarray, y: np.ndarray, max_points: int):
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    mask = np.isfinite(y)
+    x, y = x[mask], y[mask]
+    if len(y) <= max_points:
+        return x, y
+    # LTTB needs numeric x; datetimes go through their integer nanoseconds
+    if np.issubdtype(x.dtype, np.datetime64):
+        x_num = x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    else:
+        x_num = x.astype(float)
+    keep = lttb(x_num, y, max_points)
+    return x[keep], y[keep]
+
+
+def render_figure(
+    spec: FigureSpec,
+    out_dir: Path,
+    max_points: Optional[int] = None,
+) -> RenderResult:
+    """
+    Draw one FigureSpec to `out_dir / f"{spec.name}.png"` with the Agg canvas.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    if max_points is None:
+        max_points = config.RENDER_MAX_POINTS
+
+    t0 = time.perf_counter()
+    points_in = sum(len(line.y) for line in spec.lines)
+    points_out = 0
+    try:
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        for line in spec.lines:
+            x, y = _downsample(line.x, line.y, max_points)
+            points_out += len(y)
+            ax.plot(x, y, marker=line.marker, label=line.label)
+        for level in spec.hlines:
+            ax.axhline(level, color="grey", linestyle="--", linewidth=1)
+        ax.set_title(spec.title)
+        ax.set_xlabel(spec.xlabel)
+        ax.set_ylabel(spec.ylabel)
+        ax.grid(True)
+        if any(line.label for line in spec.lines):
+            ax.legend()
+        fig.tight_layout()
+
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"{spec.name}.png"
+        fig.savefig(path)
+    except Exception as exc:  # report per figure instead of failing the batch
+        return RenderResult(
+            name=spec.name,
+            path=None,
+            seconds=time.perf_counter() - t0,
+            points_in=points_in,
+            points_out=points_out,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+
+    return RenderResult(
+        name=spec.name,
+        path=path,
+        seconds=time.perf_counter() - t0,
+        points_in=points_in,
+        points_out=points_out,
+    )
+
+
+def render_figures(
+    specs: List[FigureSpec],
+    out_dir: Optional[Path] = None,
+    max_points: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> List[RenderResult]:
+    """
+    Render many FigureSpecs to files, in parallel worker processes.
+
+    Parameters
+    ----------
+    specs : list of FigureSpec
+    out_dir : Path, optional
+        Defaults to config.FIGURES_DIR.
+    max_points : int, optional
+        Per-line point budget after LTTB; defaults to config.RENDER_MAX_POINTS.
+    workers : int, optional
+        Number of processes; defaults to config.RENDER_WORKERS or the CPU
+        count. With 1 worker, figures are rendered in this process.
+
+    Returns
+    -------
+    list of RenderResult, in the order of `specs`.
+    """
+    if out_dir is None:
+        out_dir = config.FIGURES_DIR
+    if workers is None:
+        workers = config.RENDER_WORKERS or os.cpu_count() or 1
+    workers = max(1, min(int(workers), len(specs)))
+
+    if not specs:
+        return []
+    if workers == 1:
+        return [render_figure(spec, out_dir, max_points) for spec in specs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_figure, spec, out_dir, max_points) for spec in specs]
+        return [f.result() for f in futures]
@@ -0,0 +1,643 @@
+"""
+Sharded execution of panel and multi-topic workloads for EMO v0.1.
+
+Per-country OI and per-topic GWI runs are independent, so they can be
+spread over any number of processes or hosts:
+
+- `make_work_units` partitions countries / topics into work units. Unit
+  ids hash the request and a content fingerprint of every source file,
+  so re-enqueueing unchanged data is idempotent while regenerated data
+  gets new units.
+- Units go through a pluggable `WorkQueue`. Two stand-in backends are
+  provided: `SQLiteQueue` (one database file) and `FileQueue` (a
+  directory tree using atomic renames). Both lease claimed units and
+  retry failed or expired ones up to `max_attempts` times.
+- `run_worker` pulls units, calls the existing `compute_*` functions and
+  writes one partial result file per unit (skipping units whose result
+  already exists). Only the worker holding a unit's lease can complete
+  or fail it.
+- `merge_results` combines the partial results in a fixed order. Each
+  result file records its unit (sources, params, fingerprints); results
+  computed from sources that have since changed, or from units outside
+  the current request, are left out, and disagreeing results for the
+  same key are an error.
+
+Command line (queue is `sqlite:///path/to/queue.db` or a directory):
+
+    python -m emo.sharding enqueue QUEUE --kind oi --key-col country \\
+        --source treaties=data/treaties_panel.csv \\
+        --source conflict=data/conflict_panel.csv
+    python -m emo.sharding work QUEUE RESULTS_DIR
+    python -m emo.sharding merge RESULTS_DIR --out results.csv
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from . import config
+from .gwi import compute_gwi
+from .organismality import compute_organismality
+
+
+@dataclass
+class WorkUnit:
+    unit_id: str
+    kind: str
+    keys: List[str]
+    sources: Dict[str, str]
+    key_col: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    fingerprints: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, text: str) -> "WorkUnit":
+        return cls(**json.loads(text))
+
+
+def source_fingerprint(path) -> Optional[str]:
+    """
+    SHA-1 of a source file's bytes, or None if it does not exist.
+    """
+    h = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
+
+
+def make_work_units(
+    kind: str,
+    keys: Sequence[str],
+    sources: Dict[str, str],
+    key_col: Optional[str] = None,
+    shard_size: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> List[WorkUnit]:
+    """
+    Partition `keys` (countries or topics) into work units of `shard_size`.
+
+    Keys are sorted first, and each unit id hashes its kind, keys, sources,
+    params and the content fingerprint of each source, so the same request
+    on the same data always produces the same units.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown work kind {kind!r}; expected one of {sorted(HANDLERS)}")
+    if shard_size is None:
+        shard_size = config.SHARD_SIZE
+    shard_size = max(int(shard_size), 1)
+    params = dict(params or {})
+    sources = {name: str(path) for name, path in sources.items()}
+    fingerprints = {name: source_fingerprint(path) for name, path in sources.items()}
+
+    keys = sorted(set(str(k) for k in keys))
+    units = []
+    for i in range(0, len(keys), shard_size):
+        chunk = keys[i : i + shard_size]
+        digest = hashlib.sha1(
+            json.dumps(
+                [kind, chunk, sources, fingerprints, key_col, params], sort_keys=True
+            ).encode()
+        ).hexdigest()[:16]
+        units.append(
+            WorkUnit(
+                unit_id=f"{kind}-{digest}",
+                kind=kind,
+                keys=chunk,
+                sources=sources,
+                key_col=key_col,
+                params=params,
+                fingerprints=fingerprints,
+            )
+        )
+    return units
+
+
+def _tmp_path(path: Path) -> Path:
+    # Unique per process and host, and never matching "*.json"
+    return path.with_suffix(f".{socket.gethostname()}.{os.getpid()}.tmp")
+
+
+# ---------------------------------------------------------------------------
+# Handlers: one work unit -> list of result rows
+# ---------------------------------------------------------------------------
+
+
+def _select(df: pd.DataFrame, key_col: Optional[str], key: str) -> pd.DataFrame:
+    if key_col is None:
+        return df
+    return df[df[key_col].astype(str) == key]
+
+
+def _run_oi_unit(unit: WorkUnit, read: Callable[[str], pd.DataFrame]) -> List[Dict[str, Any]]:
+    treaties = read(unit.sources["treaties"])
+    conflict = read(unit.sources["conflict"])
+    rows = []
+    for key in unit.keys:
+        result = compute_organismality(
+            _select(treaties, unit.key_col, key),
+            _select(conflict, unit.key_col, key),
+            **unit.params,
+        )
+        rows.append(
+            {
+                "kind": unit.kind,
+                "key": key,
+                "latest_value": result.latest_value,
+                "trend_20y_slope": result.trend_20y_slope,
+                "n_years": len(result.series),
+            }
+        )
+    return rows
+
+
+def _run_gwi_unit(unit: WorkUnit, read: Callable[[str], pd.DataFrame]) -> List[Dict[str, Any]]:
+    news = read(unit.sources["news"])
+    wiki = read(unit.sources["wiki"])
+    rows = []
+    for key in unit.keys:
+        result = compute_gwi(
+            _select(news, unit.key_col, key),
+            _select(wiki, unit.key_col, key),
+            **unit.params,
+        )
+        rows.append(
+            {
+                "kind": unit.kind,
+                "key": key,
+                "threshold": None if result is None else result.threshold,
+                "n_events": 0 if result is None else len(result.ignition_events),
+                "n_days": 0 if result is None else len(result.time_series),
+            }
+        )
+    return rows
+
+
+HANDLERS: Dict[str, Callable[[WorkUnit, Callable[[str], pd.DataFrame]], List[Dict[str, Any]]]] = {
+    "oi": _run_oi_unit,
+    "gwi": _run_gwi_unit,
+}
+
+
+# ---------------------------------------------------------------------------
+# Queues
+# ---------------------------------------------------------------------------
+
+
+class WorkQueue(ABC):
+    """
+    Interface for work-unit queues.
+
+    A claimed unit is leased to one worker for `lease_seconds`; if it is
+    neither completed nor failed by then it becomes claimable again.
+    Each claim counts as an attempt; after `max_attempts` the unit is
+    marked failed. `complete` and `fail` only apply while `worker_id`
+    still holds the unit's lease.
+    """
+
+    @abstractmethod
+    def put(self, units: Sequence[WorkUnit]) -> int:
+        """Enqueue units, ignoring ids already known. Returns the number added."""
+
+    @abstractmethod
+    def claim(self, worker_id: str) -> Optional[WorkUnit]:
+        """Lease the next available unit, or None if there is none."""
+
+    @abstractmethod
+    def complete(self, unit_id: str, worker_id: str) -> bool:
+        """Mark a leased unit done. Returns False if the lease was lost."""
+
+    @abstractmethod
+    def fail(self, unit_id: str, worker_id: str, error: str) -> bool:
+        """Release a leased unit for retry (or give up). False if the lease was lost."""
+
+    @abstractmethod
+    def status(self) -> Dict[str, int]:
+        """Number of units per state (pending, claimed, done, failed)."""
+
+
+class SQLiteQueue(WorkQueue):
+    """
+    Work queue in a single SQLite database file.
+    """
+
+    def __init__(
+        self,
+        path,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.lease_seconds = config.SHARD_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.max_attempts = config.SHARD_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30.0, isolation_level=None)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS units (
+                unit_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_until REAL,
+                worker TEXT,
+                error TEXT
+            )
+            """
+        )
+
+    def put(self, units: Sequence[WorkUnit]) -> int:
+        cur = self._conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        added = 0
+        for unit in units:
+            cur.execute(
+                "INSERT OR IGNORE INTO units (unit_id, payload) VALUES (?, ?)",
+                (unit.unit_id, unit.to_json()),
+            )
+            added += cur.rowcount
+        cur.execute("COMMIT")
+        return added
+
+    def claim(self, worker_id: str) -> Optional[WorkUnit]:
+        now = time.time()
+        cur = self._conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that used up their attempts are given up on
+            cur.execute(
+                "UPDATE units SET status = 'failed', error = 'lease expired' "
+                "WHERE status = 'claimed' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = cur.execute(
+                "SELECT unit_id, payload FROM units "
+                "WHERE status = 'pending' OR (status = 'claimed' AND lease_until < ?) "
+                "ORDER BY unit_id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                cur.execute(
+                    "UPDATE units SET status = 'claimed', attempts = attempts + 1, "
+                    "lease_until = ?, worker = ? WHERE unit_id = ?",
+                    (now + self.lease_seconds, worker_id, row[0]),
+                )
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        return None if row is None else WorkUnit.from_json(row[1])
+
+    def complete(self, unit_id: str, worker_id: str) -> bool:
+        cur = self._conn.execute(
+            "UPDATE units SET status = 'done', lease_until = NULL, error = NULL "
+            "WHERE unit_id = ? AND worker = ? AND status = 'claimed'",
+            (unit_id, worker_id),
+        )
+        return cur.rowcount > 0
+
+    def fail(self, unit_id: str, worker_id: str, error: str) -> bool:
+        cur = self._conn.execute(
+            "UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_until = NULL, error = ? "
+            "WHERE unit_id = ? AND worker = ? AND status = 'claimed'",
+            (self.max_attempts, error, unit_id, worker_id),
+        )
+        return cur.rowcount > 0
+
+    def status(self) -> Dict[str, int]:
+        counts = {s: 0 for s in ("pending", "claimed", "done", "failed")}
+        for s, n in self._conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status"):
+            counts[s] = n
+        return counts
+
+
+class FileQueue(WorkQueue):
+    """
+    Work queue as a directory tree: one JSON file per unit, moved between
+    pending/, claimed/, done/ and failed/ with atomic renames. Works on
+    any shared filesystem with atomic same-directory-tree renames.
+    """
+
+    STATES = ("pending", "claimed", "done", "failed")
+
+    def __init__(
+        self,
+        root,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.lease_seconds = config.SHARD_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.max_attempts = config.SHARD_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        for state in self.STATES:
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+
+    def _file(self, state: str, unit_id: str) -> Path:
+        return self.root / state / f"{unit_id}.json"
+
+    def _read(self, path: Path) -> Dict[str, Any]:
+        return json.loads(path.read_text())
+
+    def _write(self, path: Path, record: Dict[str, Any]) -> None:
+        tmp = _tmp_path(path)
+        tmp.write_text(json.dumps(record, sort_keys=True))
+        os.replace(tmp, path)
+
+    def _move(self, unit_id: str, src: str, dst: str) -> bool:
+        try:
+            os.rename(self._file(src, unit_id), self._file(dst, unit_id))
+            return True
+        except FileNotFoundError:
+            return False  # another worker got there first
+
+    def put(self, units: Sequence[WorkUnit]) -> int:
+        added = 0
+        for unit in units:
+            if any(self._file(s, unit.unit_id).exists() for s in self.STATES):
+                continue
+            record = {"unit": asdict(unit), "attempts": 0, "error": None}
+            self._write(self._file("pending", unit.unit_id), record)
+            added += 1
+        return added
+
+    def _requeue_expired(self) -> None:
+        now = time.time()
+        for path in sorted((self.root / "claimed").glob("*.json")):
+            try:
+                expired = path.stat().st_mtime + self.lease_seconds < now
+                if not expired:
+                    continue
+                attempts = self._read(path)["attempts"]
+            except (FileNotFoundError, ValueError):
+                continue
+            self._move(path.stem, "claimed", "failed" if attempts >= self.max_attempts else "pending")
+
+    def claim(self, worker_id: str) -> Optional[WorkUnit]:
+        self._requeue_expired()
+        for path in sorted((self.root / "pending").glob("*.json")):
+            unit_id = path.stem
+            try:
+                # rename keeps the mtime, so start the lease before the move
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            if not self._move(unit_id, "pending", "claimed"):
+                continue
+            claimed = self._file("claimed", unit_id)
+            try:
+                record = self._read(claimed)
+                record["attempts"] += 1
+                record["worker"] = worker_id
+                self._write(claimed, record)  # also refreshes the lease (mtime)
+            except FileNotFoundError:
+                continue  # requeued by another worker in between
+            return WorkUnit(**record["unit"])
+        return None
+
+    def _leased_record(self, unit_id: str, worker_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            record = self._read(self._file("claimed", unit_id))
+        except (FileNotFoundError, ValueError):
+            return None
+        return record if record.get("worker") == worker_id else None
+
+    def complete(self, unit_id: str, worker_id: str) -> bool:
+        if self._leased_record(unit_id, worker_id) is None:
+            return False
+        return self._move(unit_id, "claimed", "done")
+
+    def fail(self, unit_id: str, worker_id: str, error: str) -> bool:
+        record = self._leased_record(unit_id, worker_id)
+        if record is None:
+            return False
+        record["error"] = error
+        self._write(self._file("claimed", unit_id), record)
+        dst = "failed" if record["attempts"] >= self.max_attempts else "pending"
+        return self._move(unit_id, "claimed", dst)
+
+    def status(self) -> Dict[str, int]:
+        return {s: len(list((self.root / s).glob("*.json"))) for s in self.STATES}
+
+
+def open_queue(spec: str, **kwargs) -> WorkQueue:
+    """
+    `sqlite:///path/to/queue.db` -> SQLiteQueue; anything else is a
+    FileQueue directory.
+    """
+    if spec.startswith("sqlite://"):
+        return SQLiteQueue(spec[len("sqlite://") :], **kwargs)
+    return FileQueue(spec, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Workers and merging
+# ---------------------------------------------------------------------------
+
+
+def run_worker(
+    queue: WorkQueue,
+    results_dir,
+    worker_id: Optional[str] = None,
+    max_units: Optional[int] = None,
+) -> int:
+    """
+    Process units from `queue` until it is empty (or `max_units` are done).
+
+    Each unit's rows are written to `results_dir / f"{unit_id}.json"`.
+    Units whose result file already exists are acknowledged without
+    recomputing, so re-runs are idempotent.
+
+    Returns
+    -------
+    Number of units completed by this worker.
+    """
+    if worker_id is None:
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    # Source hashes are cached by (path, mtime, size); frames by content
+    fp_cache: Dict[Tuple[str, int, int], Optional[str]] = {}
+    frames: Dict[Tuple[str, Optional[str]], pd.DataFrame] = {}
+
+    def fingerprint(path: str) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = (path, st.st_mtime_ns, st.st_size)
+        if key not in fp_cache:
+            fp_cache[key] = source_fingerprint(path)
+        return fp_cache[key]
+
+    def read(path: str) -> pd.DataFrame:
+        key = (path, fingerprint(path))
+        if key not in frames:
+            frames[key] = pd.read_csv(path)
+        return frames[key]
+
+    done = 0
+    while max_units is None or done < max_units:
+        unit = queue.claim(worker_id)
+        if unit is None:
+            break
+
+        out = results_dir / f"{unit.unit_id}.json"
+        if not out.exists():
+            try:
+                for name, path in unit.sources.items():
+                    if fingerprint(path) != unit.fingerprints.get(name):
+                        raise RuntimeError(f"source {name!r} ({path}) changed since enqueue")
+                rows = HANDLERS[unit.kind](unit, read)
+            except Exception as exc:
+                print(f"[WARN] Work unit {unit.unit_id} failed: {type(exc).__name__}: {exc}")
+                queue.fail(unit.unit_id, worker_id, f"{type(exc).__name__}: {exc}")
+                continue
+            tmp = _tmp_path(out)
+            tmp.write_text(json.dumps({"unit": asdict(unit), "rows": rows}, sort_keys=True))
+            os.replace(tmp, out)
+
+        if not queue.complete(unit.unit_id, worker_id):
+            print(f"[WARN] Lost the lease on work unit {unit.unit_id}; result kept for re-runs.")
+            continue
+        done += 1
+    return done
+
+
+def merge_results(
+    results_dir,
+    kind: Optional[str] = None,
+    units: Optional[Sequence[WorkUnit]] = None,
+) -> pd.DataFrame:
+    """
+    Combine partial results into one table sorted by [kind, key].
+
+    If `units` is given, only their results are merged. Otherwise a result
+    is merged only if every source it was computed from still has the
+    fingerprint recorded with it; stale results are skipped with a warning.
+
+    The output does not depend on which worker produced which unit or in
+    which order units finished. Raises ValueError if two merged results
+    for the same (kind, key) disagree.
+    """
+    wanted = None if units is None else {u.unit_id for u in units}
+    current: Dict[str, Optional[str]] = {}
+
+    rows: List[Dict[str, Any]] = []
+    n_stale = 0
+    for path in sorted(Path(results_dir).glob("*.json")):
+        record = json.loads(path.read_text())
+        unit = record.get("unit")
+        if wanted is not None:
+            if unit is None or unit["unit_id"] not in wanted:
+                continue
+        else:
+            if unit is None:
+                n_stale += 1
+                continue
+            for name, src in unit["sources"].items():
+                if src not in current:
+                    current[src] = source_fingerprint(src)
+            fingerprints = unit["fingerprints"]
+            if any(current[src] != fingerprints.get(name) for name, src in unit["sources"].items()):
+                n_stale += 1
+                continue
+        rows.extend(record["rows"])
+    if n_stale:
+        print(f"[WARN] Skipped {n_stale} result file(s) computed from out-of-date sources.")
+
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    if kind is not None:
+        df = df[df["kind"] == kind]
+    df = df.drop_duplicates()
+    conflicts = df.loc[df.duplicated(subset=["kind", "key"]), ["kind", "key"]]
+    if not conflicts.empty:
+        pairs = sorted(set(map(tuple, conflicts.to_numpy().tolist())))
+        raise ValueError(f"Conflicting results for (kind, key): {pairs}")
+    df = df[["kind", "key"] + [c for c in df.columns if c not in ("kind", "key")]]
+    return df.sort_values(["kind", "key"], kind="stable").reset_index(drop=True)
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+_DEFAULT_KEYS = {"oi": "World", "gwi": config.GWI_TOPIC_NAME}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m emo.sharding")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_enq = sub.add_parser("enqueue", help="Partition keys into work units")
+    p_enq.add_argument("queue")
+    p_enq.add_argument("--kind", choices=sorted(HANDLERS), required=True)
+    p_enq.add_argument(
+        "--source", action="append", default=[], metavar="NAME=PATH",
+        help="oi: treaties=, conflict=; gwi: news=, wiki=",
+    )
+    p_enq.add_argument("--key-col", default=None, help="Country / topic column")
+    p_enq.add_argument("--shard-size", type=int, default=None)
+
+    p_work = sub.add_parser("work", help="Process units until the queue is empty")
+    p_work.add_argument("queue")
+    p_work.add_argument("results_dir")
+    p_work.add_argument("--max-units", type=int, default=None)
+
+    p_merge = sub.add_parser("merge", help="Merge partial results")
+    p_merge.add_argument("results_dir")
+    p_merge.add_argument("--out", default=None, help="CSV output path (default: print)")
+
+    p_status = sub.add_parser("status", help="Show unit counts per state")
+    p_status.add_argument("queue")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        sources = dict(s.split("=", 1) for s in args.source)
+        if args.key_col is None:
+            keys = [_DEFAULT_KEYS[args.kind]]
+        else:
+            keys = sorted(
+                set().union(
+                    *(set(pd.read_csv(p, usecols=[args.key_col])[args.key_col].astype(str))
+                      for p in sources.values())
+                )
+            )
+        units = make_work_units(args.kind, keys, sources, args.key_col, args.shard_size)
+        added = open_queue(args.queue).put(units)
+        print(f"Enqueued {added} new unit(s) ({len(units) - added} already known).")
+    elif args.command == "work":
+        n = run_worker(open_queue(args.queue), args.results_dir, max_units=args.max_units)
+        print(f"Completed {n} unit(s).")
+    elif args.command == "merge":
+        df = merge_results(args.results_dir)
+        if args.out:
+            df.to_csv(args.out, index=False)
+        else:
+            print(df.to_string(index=False))
+    elif args.command == "status":
+        print(open_queue(args.queue).status())
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,7 @@ We compute:
 """
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence
 
 import numpy as np
 import pandas as pd
@@ -28,23 +28,24 @@ class SMFResult:
     correlation: Optional[float]
 
 
-def compute_smf(
+def _gap_frame(
     target_df: pd.DataFrame,
     actual_df: pd.DataFrame,
-    year_col: str = "year",
-    target_col: str = "co2_target",
-    actual_col: str = "co2_actual",
-    k: float = 5.0,
-) -> SMFResult:
+    year_col: str,
+    target_col: str,
+    actual_col: str,
+) -> pd.DataFrame:
     """
-    Compute Self-Model Fidelity (SMF) from yearly target and actual trajectories.
+    Align target and actual on year and compute the normalized gap.
+
+    This is everything in `compute_smf` that does not depend on k.
     """
     t = target_df[[year_col, target_col]].copy()
     a = actual_df[[year_col, actual_col]].copy()
 
     df = pd.merge(t, a, on=year_col, how="inner").dropna()
     if df.empty:
-        return SMFResult(series=pd.DataFrame(), global_smf=None, correlation=None)
+        return df
 
     df[target_col] = df[target_col].astype(float)
     df[actual_col] = df[actual_col].astype(float)
@@ -56,6 +57,29 @@ def compute_smf(
         eps,
     )
     df["gap_norm"] = (df[actual_col] - df[target_col]) / denom
+    return df
+
+
+def _correlation(df: pd.DataFrame, target_col: str, actual_col: str) -> Optional[float]:
+    if len(df) >= 2:
+        return float(df[[target_col, actual_col]].corr().iloc[0, 1])
+    return None
+
+
+def compute_smf(
+    target_df: pd.DataFrame,
+    actual_df: pd.DataFrame,
+    year_col: str = "year",
+    target_col: str = "co2_target",
+    actual_col: str = "co2_actual",
+    k: float = 5.0,
+) -> SMFResult:
+    """
+    Compute Self-Model Fidelity (SMF) from yearly target and actual trajectories.
+    """
+    df = _gap_frame(target_df, actual_df, year_col, target_col, actual_col)
+    if df.empty:
+        return SMFResult(series=pd.DataFrame(), global_smf=None, correlation=None)
 
     # SMF(t): high when |gap_norm| is small
     df["smf"] = logistic(-np.abs(df["gap_norm"].values) * k)
@@ -63,13 +87,51 @@ def compute_smf(
     global_smf = float(df["smf"].mean())
 
     # Correlation
-    if len(df) >= 2:
-        corr = float(df[[target_col, actual_col]].corr().iloc[0, 1])
-    else:
-        corr = None
+    corr = _correlation(df, target_col, actual_col)
 
     return SMFResult(
         series=df.sort_values(year_col),
         global_smf=global_smf,
         correlation=corr,
     )
+
+
+def sweep_smf_k(
+    target_df: pd.DataFrame,
+    actual_df: pd.DataFrame,
+    ks: Sequence[float],
+    year_col: str = "year",
+    target_col: str = "co2_target",
+    actual_col: str = "co2_actual",
+) -> Optional[pd.DataFrame]:
+    """
+    Evaluate `compute_smf` for many steepness values k in one pass.
+
+    The year alignment and normalized gap are computed once; SMF(t) for
+    every k is a single broadcast over a (len(ks), n_years) array.
+
+    Returns
+    -------
+    pd.DataFrame with [k, global_smf, min_smf, latest_smf, correlation],
+    one row per requested k, or None if the trajectories do not overlap.
+    """
+    df = _gap_frame(target_df, actual_df, year_col, target_col, actual_col)
+    if df.empty:
+        return None
+
+    df = df.sort_values(year_col)
+    k = np.atleast_1d(np.asarray(ks, dtype=float))
+    abs_gap = np.abs(df["gap_norm"].to_numpy(dtype=float))
+
+    smf = logistic(-abs_gap[None, :] * k[:, None])
+    corr = _correlation(df, target_col, actual_col)
+
+    return pd.DataFrame(
+        {
+            "k": k,
+            "global_smf": smf.mean(axis=1),
+            "min_smf": smf.min(axis=1),
+            "latest_smf": smf[:, -1],
+            "correlation": np.nan if corr is None else corr,
+        }
+    )
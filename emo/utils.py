@@ -44,6 +44,16 @@ def zscore(series: pd.Series) -> pd.Series:
     return (s - mean) / std
 
 
+def as_datetime(series: pd.Series) -> pd.Series:
+    """
+    Parse a date column, skipping the work if it is already datetime64
+    (e.g. loaded through `data_sources`).
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series)
+
+
 def simple_linear_trend(x: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
     """
     Fit a simple linear trend y = a * x + b using numpy.polyfit.
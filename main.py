@@ -10,15 +10,14 @@ This script:
     - Self-Model Fidelity (SMF)
     - Information-time (τ_I)
 - Prints summary results to the console.
-
-You can later extend it to produce plots, figures, or write to files.
+- Renders metric figures to `figures/` once all numbers are printed.
 """
 
 import textwrap
+from typing import List, Optional
 
-import matplotlib.pyplot as plt
-
-from emo import data_sources, organismality, synergy, gwi, smf, info_time
+from emo import data_sources, organismality, synergy, gwi, smf, info_time, render
+from emo.render import FigureSpec, LineSpec
 
 
 def print_header(title: str) -> None:
@@ -27,7 +26,18 @@ def print_header(title: str) -> None:
     print("=" * 80)
 
 
-def run_organismality() -> None:
+def run_data_checks() -> None:
+    issues = {name: probs for name, probs in data_sources.validate_sources().items() if probs}
+    if not issues:
+        return
+
+    print_header("Data source checks")
+    for name, problems in issues.items():
+        for problem in problems:
+            print(f"[WARN] {name}: {problem}")
+
+
+def run_organismality() -> Optional[FigureSpec]:
     print_header("Organismality Index (OI)")
 
     treaties_df = data_sources.load_treaties()
@@ -51,15 +61,15 @@ def run_organismality() -> None:
 
     # Simple OI plot
     df = result.series
-    if not df.empty:
-        plt.figure()
-        plt.plot(df["year"], df["oi"], marker="o")
-        plt.title("Organismality Index (OI) over time")
-        plt.xlabel("Year")
-        plt.ylabel("OI")
-        plt.grid(True)
-        plt.tight_layout()
-        plt.show()
+    if df.empty:
+        return None
+    return FigureSpec(
+        name="organismality",
+        title="Organismality Index (OI) over time",
+        xlabel="Year",
+        ylabel="OI",
+        lines=[LineSpec(df["year"].values, df["oi"].values, marker="o")],
+    )
 
 
 def run_synergy() -> None:
@@ -81,7 +91,7 @@ def run_synergy() -> None:
     print(f"Streams used: {', '.join(result.used_columns)}")
 
 
-def run_gwi() -> None:
+def run_gwi() -> Optional[FigureSpec]:
     print_header("Global Workspace Ignition (GWI)")
 
     news_df, wiki_df = data_sources.load_gwi_streams()
@@ -103,8 +113,18 @@ def run_gwi() -> None:
         print("Sample ignition events (first 5):")
         print(result.ignition_events.head()[["date", "ignition"]])
 
+    df = result.time_series
+    return FigureSpec(
+        name="gwi",
+        title="Global Workspace Ignition (GWI)",
+        xlabel="Date",
+        ylabel="Ignition",
+        lines=[LineSpec(df["date"].values, df["ignition"].values)],
+        hlines=[result.threshold],
+    )
+
 
-def run_smf() -> None:
+def run_smf() -> Optional[FigureSpec]:
     print_header("Self-Model Fidelity (SMF)")
 
     target_df = data_sources.load_co2_target()
@@ -126,8 +146,17 @@ def run_smf() -> None:
     else:
         print("Correlation: not enough data.")
 
+    df = result.series
+    return FigureSpec(
+        name="smf",
+        title="Self-Model Fidelity (SMF) over time",
+        xlabel="Year",
+        ylabel="SMF",
+        lines=[LineSpec(df["year"].values, df["smf"].values, marker="o")],
+    )
+
 
-def run_info_time() -> None:
+def run_info_time() -> Optional[FigureSpec]:
     print_header("Information-time (τ_I)")
 
     skill_df = data_sources.load_ecmwf_skill()
@@ -148,6 +177,29 @@ def run_info_time() -> None:
     else:
         print("Acceleration factor: undefined (calendar span <= 0).")
 
+    df = result.series
+    return FigureSpec(
+        name="info_time",
+        title="Information-time (τ_I)",
+        xlabel="Year",
+        ylabel="τ_I",
+        lines=[LineSpec(df["year"].values, df["tau_I"].values, marker="o")],
+    )
+
+
+def run_figures(specs: List[Optional[FigureSpec]]) -> None:
+    specs = [s for s in specs if s is not None]
+    if not specs:
+        return
+
+    print_header("Figures")
+
+    for r in render.render_figures(specs):
+        if r.error is not None:
+            print(f"[WARN] Could not render {r.name}: {r.error}")
+            continue
+        print(f"{r.path} ({r.points_out}/{r.points_in} points, {r.seconds:.2f} s)")
+
 
 def main() -> None:
     print(
@@ -164,11 +216,15 @@ def main() -> None:
         )
     )
 
-    run_organismality()
+    run_data_checks()
+
+    figures = [run_organismality()]
     run_synergy()
-    run_gwi()
-    run_smf()
-    run_info_time()
+    figures.append(run_gwi())
+    figures.append(run_smf())
+    figures.append(run_info_time())
+
+    run_figures(figures)
 
 
 if __name__ == "__main__":